@@ -1,18 +1,29 @@
 import os
 import sys
-import os
 import asyncio
+import contextlib
+import functools
+import io
+import json
+import re
+import shutil
 import logging
 import time
 import argparse
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 from dataclasses import dataclass
+from operator import itemgetter
+import aiofiles
+import aiofiles.os
 import aiohttp
+import attr
+import numpy as np
+import orjson
 import yt_dlp
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import RetryError, retry, stop_after_attempt, wait_exponential
 
 # Configuração de logging
 logging.basicConfig(
@@ -37,6 +48,11 @@ class APIError(TranscriptionError):
     """Erro na comunicação com a API."""
     pass
 
+@functools.lru_cache(maxsize=1)
+def _which_ffmpeg() -> Optional[str]:
+    """Procura o ffmpeg no PATH, uma única vez por processo."""
+    return shutil.which('ffmpeg')
+
 @dataclass
 class Config:
     """Configuração da aplicação."""
@@ -45,23 +61,48 @@ class Config:
     check_interval: int = 30
     timeout: int = 36000
     chunk_size: int = 5242880
+    max_concurrency: int = 4
+    upload_timeout: int = 300
+    upload_min_speed: int = 65536
 
     @classmethod
+    @functools.lru_cache(maxsize=1)
     def from_env(cls) -> 'Config':
-        """Cria configuração a partir de variáveis de ambiente."""
+        """Cria configuração a partir de variáveis de ambiente (carregada uma única vez)."""
         load_dotenv()
         api_key = os.getenv('ASSEMBLYAI_API_KEY')
-        ffmpeg_path = os.getenv('FFMPEG_PATH')
+        ffmpeg_path = os.getenv('FFMPEG_PATH') or _which_ffmpeg()
 
         if not api_key:
             raise ValueError("ASSEMBLYAI_API_KEY não encontrada no arquivo .env")
         if not ffmpeg_path:
-            raise ValueError("FFMPEG_PATH não encontrado no arquivo .env")
+            raise ValueError("FFMPEG_PATH não encontrado no arquivo .env nem no PATH")
         if not os.path.exists(ffmpeg_path):
             raise ValueError(f"FFMPEG não encontrado no caminho: {ffmpeg_path}")
 
         return cls(api_key=api_key, ffmpeg_path=Path(ffmpeg_path))
 
+def _format_time(ms: int) -> str:
+    """Formata tempo em milissegundos como mm:ss.ss."""
+    minutes, seconds = divmod(ms / 1000, 60)
+    return f"{int(minutes):02d}:{seconds:05.2f}"
+
+# A partir deste número de palavras os timestamps são calculados com NumPy
+VECTORIZE_MIN_WORDS = 10000
+
+# "ss.ss" pré-formatado para cada centésimo de segundo (inclui 60.00, como _format_time)
+_SECONDS_TEXT = tuple(f"{c // 100:02d}.{c % 100:02d}" for c in range(6001))
+
+def _split_times(ms: np.ndarray) -> Tuple[List[int], List[int]]:
+    """Versão vetorizada de _format_time: retorna minutos e centésimos de segundo."""
+    minutes = ms // 60000
+    centis = (ms % 60000 + 5) // 10
+    # Meio centésimo exato: o arredondamento depende do float, como em _format_time
+    ties = np.flatnonzero(ms % 10 == 5)
+    if ties.size:
+        centis[ties] = [round(float(f"{s:.2f}") * 100) for s in (ms[ties] / 1000 % 60).tolist()]
+    return minutes.tolist(), centis.tolist()
+
 class ProgressTracker:
     """Rastreador de progresso genérico."""
     def __init__(self, description: str):
@@ -78,10 +119,73 @@ class ProgressTracker:
         """Marca como completo."""
         print(f"\n{self.description} concluído!")
 
+class TitleCache:
+    """Cache em disco de títulos de vídeo, carregado uma única vez."""
+    def __init__(self, path: Path = Path(".cache/titles.json")):
+        self.path = path
+        self._titles: Optional[Dict[str, str]] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _read(self) -> Dict[str, str]:
+        """Lê o cache do disco; conteúdo inválido é tratado como cache vazio."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, titles: Dict[str, str]):
+        """Grava o cache de forma atômica."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(titles, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    async def _load(self) -> Dict[str, str]:
+        """Carrega o cache fora do event loop na primeira chamada."""
+        # Lock criado sob demanda, já dentro do event loop em execução
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if self._titles is None:
+            async with self._lock:
+                if self._titles is None:
+                    self._titles = await asyncio.to_thread(self._read)
+        return self._titles
+
+    async def get(self, video_id: str) -> Optional[str]:
+        """Retorna o título em cache, se houver."""
+        return (await self._load()).get(video_id)
+
+    async def set(self, video_id: str, title: str):
+        """Adiciona um título e grava uma cópia do cache fora do event loop."""
+        titles = await self._load()
+        titles[video_id] = title
+        try:
+            # O lock evita escritas simultâneas no arquivo .tmp
+            async with self._lock:
+                await asyncio.to_thread(self._write, dict(titles))
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o título no cache: {e}")
+
 class YouTubeDownloader:
     """Gerenciador de download de vídeos do YouTube."""
-    def __init__(self, ffmpeg_path: Path):
+    # \w casa exatamente str.isalnum() mais '_'; remove o resto, exceto ' ' e '-'
+    TITLE_DISALLOWED = re.compile(r'[^\w \-]')
+    # Extensão de saída -> codec do FFmpegExtractAudio que gera essa mesma extensão
+    AUDIO_CODECS = {
+        'mp3': 'mp3',
+        'm4a': 'm4a',
+        'opus': 'opus',
+        'ogg': 'vorbis',
+        'flac': 'flac',
+        'wav': 'wav',
+    }
+
+    def __init__(self, ffmpeg_path: Path, title_cache: Optional[TitleCache] = None):
         self.ffmpeg_path = ffmpeg_path
+        self.title_cache = title_cache or TitleCache()
         self.progress = ProgressTracker("Download")
 
     def progress_hook(self, d: Dict[str, Any]):
@@ -97,8 +201,11 @@ class YouTubeDownloader:
         elif d['status'] == 'error':
             raise DownloadError(f"Erro no download: {d.get('error')}")
 
-    async def download(self, video_id: str) -> Tuple[str, str]:
-        """Download assíncrono do vídeo."""
+    async def download(self, video_id: str, fetch_audio: bool = True) -> Tuple[str, str, str]:
+        """Download assíncrono do vídeo. Retorna (áudio, transcrição, título).
+
+        Com fetch_audio=False apenas resolve os caminhos, sem baixar o áudio.
+        """
         video_url = f"https://www.youtube.com/watch?v={video_id}"
         
         try:
@@ -106,26 +213,30 @@ class YouTubeDownloader:
             if not title:
                 raise DownloadError("Não foi possível obter o título do vídeo")
 
-            audio_path = f"audios/{title}.mp3"
+            audio_path = f"audios/{title}.m4a"
             transcript_path = f"transcricoes/{title}.txt"
 
-            os.makedirs("audios", exist_ok=True)
-            os.makedirs("transcricoes", exist_ok=True)
+            await aiofiles.os.makedirs("audios", exist_ok=True)
+            await aiofiles.os.makedirs("transcricoes", exist_ok=True)
 
-            if os.path.exists(transcript_path):
+            if await aiofiles.os.path.exists(transcript_path):
                 logger.info(f"Transcrição já existe: {transcript_path}")
-                return audio_path, transcript_path
+                return audio_path, transcript_path, title
 
-            if not os.path.exists(audio_path):
+            if fetch_audio and not await aiofiles.os.path.exists(audio_path):
                 await self._download_audio(video_url, audio_path)
 
-            return audio_path, transcript_path
+            return audio_path, transcript_path, title
 
         except Exception as e:
             raise DownloadError(f"Erro ao baixar vídeo: {str(e)}")
 
     async def get_video_title(self, video_id: str) -> Optional[str]:
-        """Obtém o título do vídeo."""
+        """Obtém o título do vídeo, consultando o cache local antes do yt-dlp."""
+        cached = await self.title_cache.get(video_id)
+        if cached:
+            return cached
+
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
@@ -133,34 +244,72 @@ class YouTubeDownloader:
         }
         try:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(
+                info = await asyncio.to_thread(
+                    ydl.extract_info,
                     f"https://www.youtube.com/watch?v={video_id}",
                     download=False
                 )
-                return "".join(c for c in info['title'] if c.isalnum() or c in (' ', '-', '_'))
+                title = self.TITLE_DISALLOWED.sub('', info['title'])
         except Exception as e:
             logger.error(f"Erro ao obter título do vídeo: {e}")
             return None
 
-    async def _download_audio(self, video_url: str, output_path: str):
-        """Download do áudio do vídeo."""
-        output_template = os.path.splitext(output_path)[0]
+        await self.title_cache.set(video_id, title)
+        return title
+
+    async def get_audio_url(self, video_id: str) -> Optional[str]:
+        """Obtém a URL direta do stream de áudio no CDN do YouTube."""
         ydl_opts = {
-            'ffmpeg_location': str(self.ffmpeg_path),
             'format': 'bestaudio/best',
+            'quiet': True,
+            'no_warnings': True,
+        }
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = await asyncio.to_thread(
+                    ydl.extract_info,
+                    f"https://www.youtube.com/watch?v={video_id}",
+                    download=False
+                )
+                return info.get('url')
+        except Exception as e:
+            logger.error(f"Erro ao obter URL do áudio: {e}")
+            return None
+
+    async def _download_audio(self, video_url: str, output_path: str) -> str:
+        """Download do áudio do vídeo no formato indicado pela extensão de output_path.
+
+        Para .m4a o stream AAC do YouTube é mantido como está, sem passar pelo
+        ffmpeg; outras extensões (ex.: .mp3) ainda são convertidas. Sem extensão,
+        gera .mp3 como antes. Retorna o caminho do arquivo gerado.
+        """
+        output_template, ext = os.path.splitext(output_path)
+        ext = ext.lstrip('.').lower() or 'mp3'
+        codec = self.AUDIO_CODECS.get(ext)
+        if not codec:
+            raise DownloadError(
+                f"Formato de áudio não suportado: '.{ext}' "
+                f"(use {', '.join('.' + e for e in self.AUDIO_CODECS)})"
+            )
+        ydl_opts = {
+            'ffmpeg_location': str(self.ffmpeg_path),
+            'format': 'bestaudio[ext=m4a]/bestaudio/best',
             'postprocessors': [{
                 'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
+                'preferredcodec': codec,
                 'preferredquality': '192',
             }],
-            'outtmpl': output_template,
+            'outtmpl': f'{output_template}.%(ext)s',
             'progress_hooks': [self.progress_hook],
             'quiet': True,
             'no_warnings': True,
         }
 
+        # yt-dlp é síncrono; roda em thread para não bloquear o event loop
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([video_url])
+            await asyncio.to_thread(ydl.download, [video_url])
+
+        return f"{output_template}.{ext}"
 
 class Transcriber:
     """Gerenciador de transcrição usando AssemblyAI."""
@@ -171,59 +320,118 @@ class Transcriber:
             "content-type": "application/json"
         }
         self.session: Optional[aiohttp.ClientSession] = None
+        self._resolver: Optional[aiohttp.AsyncResolver] = None
 
     async def __aenter__(self):
         """Contexto assíncrono para gerenciar a sessão HTTP."""
-        self.session = aiohttp.ClientSession()
+        # Pool com keep-alive e cache de DNS, compartilhado por todos os vídeos do lote;
+        # o AsyncResolver (aiodns) resolve nomes sem ocupar threads com getaddrinfo
+        self._resolver = aiohttp.AsyncResolver()
+        connector = aiohttp.TCPConnector(
+            resolver=self._resolver,
+            limit=32,
+            limit_per_host=16,
+            ttl_dns_cache=300,
+            keepalive_timeout=75,
+        )
+        # Sem limite total: uploads grandes e transcrições longas passam de 5 minutos
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=60)
+        # orjson (C) no lugar do json da stdlib; dumps retorna bytes, aiohttp espera str
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            json_serialize=lambda obj: orjson.dumps(obj).decode()
+        )
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Limpeza do contexto assíncrono."""
         if self.session:
             await self.session.close()
+        # O connector não é dono de um resolver recebido; fecha o canal aiodns aqui
+        if self._resolver:
+            await self._resolver.close()
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def upload_audio(self, audio_path: str) -> str:
         """Upload do arquivo de áudio com retry."""
-        if not os.path.exists(audio_path):
+        if not await aiofiles.os.path.exists(audio_path):
             raise UploadError(f"Arquivo não encontrado: {audio_path}")
 
         try:
             logger.info(f"Iniciando upload: {audio_path}")
-            data = aiohttp.FormData()
-            data.add_field('file', open(audio_path, 'rb'))
-
-            async with self.session.post(
-                'https://api.assemblyai.com/v2/upload',
-                headers=self.headers,
-                data=data
-            ) as response:
-                response.raise_for_status()
-                result = await response.json()
-                return result['upload_url']
+            # Corpo binário em streaming com Content-Length explícito,
+            # evitando carregar o arquivo inteiro em memória e o modo chunked
+            size = await aiofiles.os.path.getsize(audio_path)
+            headers = {
+                "authorization": self.config.api_key,
+                "content-type": "application/octet-stream",
+                "content-length": str(size),
+            }
+            # Sem sock_read no upload: no aiohttp 3.8 o timer começa antes do envio
+            # do corpo. O limite total cresce com o tamanho do arquivo
+            # (upload_timeout + tempo a upload_min_speed bytes/s)
+            timeout = attr.evolve(
+                self.session.timeout,
+                total=self.config.upload_timeout + size / self.config.upload_min_speed,
+                sock_read=None,
+            )
+
+            async with aiofiles.open(audio_path, 'rb') as f:
+                async def sender():
+                    while chunk := await f.read(self.config.chunk_size):
+                        yield chunk
+
+                async with self.session.post(
+                    'https://api.assemblyai.com/v2/upload',
+                    headers=headers,
+                    data=sender(),
+                    timeout=timeout
+                ) as response:
+                    response.raise_for_status()
+                    result = await response.json(loads=orjson.loads)
+                    return result['upload_url']
 
         except Exception as e:
             raise UploadError(f"Erro no upload: {str(e)}")
 
-    async def transcribe(self, audio_path: str, transcript_path: str, video_id: str) -> Dict[str, Any]:
+    async def transcribe(self, audio_path: str, transcript_path: str, video_id: str,
+                         video_title: Optional[str] = None,
+                         include_timestamps: bool = True) -> Dict[str, Any]:
         """Processo completo de transcrição."""
+        transcript_id = await self.submit_audio(audio_path)
+        return await self.complete(transcript_id, transcript_path, video_id, video_title,
+                                   include_timestamps)
+
+    async def submit_audio(self, audio_path: str) -> str:
+        """Envia o áudio local e inicia a transcrição; remove o arquivo ao final."""
         try:
             upload_url = await self.upload_audio(audio_path)
             logger.info(f"Upload concluído: {upload_url}")
 
-            transcript_id = await self._start_transcription(upload_url)
-            result = await self._wait_for_completion(transcript_id)
-            
-            await self._save_transcript(result, transcript_path, video_id)
-            return result
+            return await self._start_transcription(upload_url)
 
         finally:
             try:
-                os.remove(audio_path)
+                await aiofiles.os.remove(audio_path)
                 logger.info(f"Áudio removido: {audio_path}")
             except Exception as e:
                 logger.error(f"Erro ao remover áudio: {e}")
 
+    async def submit_url(self, audio_url: str) -> str:
+        """Inicia a transcrição de um áudio já acessível por URL, sem upload."""
+        return await self._start_transcription(audio_url)
+
+    async def complete(self, transcript_id: str, transcript_path: str, video_id: str,
+                       video_title: Optional[str] = None,
+                       include_timestamps: bool = True) -> Dict[str, Any]:
+        """Aguarda uma transcrição já iniciada e salva o resultado."""
+        result = await self._wait_for_completion(transcript_id)
+
+        await self._save_transcript(result, transcript_path, video_id, video_title,
+                                    include_timestamps)
+        return result
+
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def _start_transcription(self, audio_url: str) -> str:
         """Inicia o processo de transcrição."""
@@ -239,24 +447,34 @@ class Transcriber:
             headers=self.headers
         ) as response:
             response.raise_for_status()
-            result = await response.json()
+            result = await response.json(loads=orjson.loads)
             return result['id']
 
     async def _wait_for_completion(self, transcript_id: str) -> Dict[str, Any]:
         """Aguarda a conclusão da transcrição."""
         progress = ProgressTracker("Transcrição")
         start_time = time.time()
+        delay = 2.0
+        etag = None
+        result = None
 
         while True:
             if time.time() - start_time > self.config.timeout:
                 raise APIError("Timeout na transcrição")
 
+            headers = dict(self.headers)
+            if etag:
+                headers["if-none-match"] = etag
+
             async with self.session.get(
                 f"https://api.assemblyai.com/v2/transcript/{transcript_id}",
-                headers=self.headers
+                headers=headers
             ) as response:
-                response.raise_for_status()
-                result = await response.json()
+                # 304: status inalterado, reaproveita o resultado anterior
+                if response.status != 304 or result is None:
+                    response.raise_for_status()
+                    etag = response.headers.get("ETag")
+                    result = await response.json(loads=orjson.loads)
 
             status = result['status']
             if status == 'completed':
@@ -267,54 +485,52 @@ class Transcriber:
             elif status == 'processing':
                 progress.update(result.get('percentage_complete', 0))
 
-            await asyncio.sleep(self.config.check_interval)
-
-    @staticmethod
-    def _format_time(ms: int) -> str:
-        """Formata tempo em milissegundos."""
-        seconds = ms / 1000
-        minutes = int(seconds // 60)
-        seconds = seconds % 60
-        return f"{minutes:02d}:{seconds:05.2f}"
+            # Backoff progressivo: consultas rápidas no início, limitado a check_interval
+            await asyncio.sleep(delay)
+            delay = min(self.config.check_interval, delay * 1.5)
 
-    async def _save_transcript(self, transcript: Dict[str, Any], path: str, video_id: str):
-        """Salva a transcrição em arquivos."""
+    async def _save_transcript(self, transcript: Dict[str, Any], path: str, video_id: str,
+                               video_title: Optional[str] = None,
+                               include_timestamps: bool = True):
+        """Salva a transcrição em arquivos; a seção de timestamps é opcional."""
         try:
             video_url = f"https://www.youtube.com/watch?v={video_id}"
-            
-            # Arquivo detalhado
-            async with aiohttp.ClientSession() as session:
-                async with session.get(video_url) as response:
-                    video_title = await response.text()
+            # O título já foi obtido no download; o nome do arquivo é o fallback
+            video_title = video_title or Path(path).stem
+
+            utterances = self._format_utterances(transcript)
 
-            content = [
+            # Cabeçalhos pequenos são unidos com join; as seções grandes vão
+            # direto para o arquivo, sem cópia intermediária
+            separator = "=" * 50 + "\n"
+            header = "\n".join([
                 "=" * 50,
                 f"TRANSCRIÇÃO DO VÍDEO: {video_title}",
                 f"URL: {video_url}",
-                "=" * 50 + "\n",
+                separator,
                 "=== INFORMAÇÕES ===\n",
                 f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                f"Duração: {self._format_time(transcript.get('audio_duration', 0))}",
-                "=" * 50 + "\n",
+                f"Duração: {_format_time(transcript.get('audio_duration', 0))}",
+                separator,
                 "=== TRANSCRIÇÃO POR FALANTES ===\n",
-                self._format_utterances(transcript),
-                "=" * 50 + "\n",
-                "=== TIMESTAMPS ===\n",
-                self._format_timestamps(transcript),
-                "=" * 50 + "\n",
-                "=== TEXTO COMPLETO ===\n",
-                transcript['text'],
-                "\n" + "=" * 50
-            ]
-
-            # Salva arquivo detalhado
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(content))
+                "",
+            ])
+
+            async with aiofiles.open(path, 'w', encoding='utf-8') as f:
+                await f.write(header)
+                await f.write(utterances)
+                await f.write("\n")
+                if include_timestamps:
+                    await f.write("\n".join([separator, "=== TIMESTAMPS ===\n", ""]))
+                    await f.writelines(self._format_timestamps(transcript))
+                await f.write("\n".join([separator, "=== TEXTO COMPLETO ===\n", ""]))
+                await f.write(transcript['text'])
+                await f.write("\n\n" + "=" * 50)
 
             # Salva arquivo simplificado
             simple_path = path.replace('.txt', '_simples.txt')
-            with open(simple_path, 'w', encoding='utf-8') as f:
-                f.write(self._format_utterances(transcript))
+            async with aiofiles.open(simple_path, 'w', encoding='utf-8') as f:
+                await f.write(utterances)
 
             logger.info(f"Transcrições salvas:\n- Detalhada: {path}\n- Simples: {simple_path}")
 
@@ -326,35 +542,130 @@ class Transcriber:
         if not transcript.get('utterances'):
             return "Sem utterances disponíveis."
 
-        formatted = []
+        # Passada única escrevendo direto no buffer, sem listas por falante
+        buf = io.StringIO()
+        write = buf.write
         current_speaker = None
-        current_text = []
 
-        for utterance in transcript['utterances']:
+        for index, utterance in enumerate(transcript['utterances']):
             speaker = utterance.get('speaker', 'Unknown')
             text = utterance.get('text', '').strip()
 
-            if current_speaker != speaker and current_text:
-                formatted.append(f"Falante {current_speaker}:\n{' '.join(current_text)}\n")
-                current_text = []
-
-            current_speaker = speaker
-            current_text.append(text)
-
-        if current_text:
-            formatted.append(f"Falante {current_speaker}:\n{' '.join(current_text)}\n")
-
-        return "\n".join(formatted)
-
-    def _format_timestamps(self, transcript: Dict[str, Any]) -> str:
-        """Formata timestamps."""
-        if not transcript.get('words'):
-            return "Sem timestamps disponíveis."
-
-        return "\n".join(
-            f"[{self._format_time(word['start'])} - {self._format_time(word['end'])}] {word['text']}"
-            for word in transcript['words']
-        )
+            if index == 0 or speaker != current_speaker:
+                if index:
+                    write("\n\n")
+                write(f"Falante {speaker}:\n")
+                current_speaker = speaker
+            else:
+                write(" ")
+            write(text)
+
+        write("\n")
+        return buf.getvalue()
+
+    def _format_timestamps(self, transcript: Dict[str, Any]) -> List[str]:
+        """Formata timestamps, uma linha por palavra."""
+        words = transcript.get('words')
+        if not words:
+            return ["Sem timestamps disponíveis.\n"]
+
+        # Laço quente: bindings locais e itemgetter evitam lookups por palavra
+        get = itemgetter('start', 'end', 'text')
+        if len(words) < VECTORIZE_MIN_WORDS:
+            ft = _format_time
+            return [f"[{ft(start)} - {ft(end)}] {text}\n" for start, end, text in map(get, words)]
+
+        starts, ends, texts = zip(*map(get, words))
+        start_min, start_cs = _split_times(np.array(starts, dtype=np.int64))
+        end_min, end_cs = _split_times(np.array(ends, dtype=np.int64))
+        sec = _SECONDS_TEXT
+        return [
+            f"[{sm:02d}:{sec[sc]} - {em:02d}:{sec[ec]}] {text}\n"
+            for sm, sc, em, ec, text in zip(start_min, start_cs, end_min, end_cs, texts)
+        ]
+
+def extract_video_id(video_input: str) -> str:
+    """Extrai o ID do vídeo de uma URL do YouTube ou retorna o próprio ID."""
+    try:
+        if 'youtube.com' in video_input:
+            return video_input.split('watch?v=')[1].split('&')[0]
+        elif 'youtu.be' in video_input:
+            return video_input.split('youtu.be/')[1].split('?')[0]
+    except IndexError:
+        raise ValueError(f"URL do YouTube não suportada: {video_input}")
+    return video_input
+
+async def transcribe_video(downloader: YouTubeDownloader, transcriber: 'Transcriber',
+                           video_id: str, audio_path: str, transcript_path: str,
+                           title: str, direct_url: bool = False,
+                           include_timestamps: bool = True,
+                           sem: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
+    """Transcreve um vídeo, tentando a URL direta do áudio antes do download + upload.
+
+    O semáforo, se fornecido, limita apenas download, upload e envio à API;
+    a espera pela transcrição roda fora dele.
+    """
+    gate = sem or contextlib.nullcontext()
+
+    if direct_url:
+        transcript_id = None
+        async with gate:
+            audio_url = await downloader.get_audio_url(video_id)
+            if audio_url:
+                try:
+                    transcript_id = await transcriber.submit_url(audio_url)
+                except RetryError as e:
+                    logger.warning(f"Falha ao enviar a URL direta ({e}); usando download + upload")
+        if transcript_id:
+            try:
+                return await transcriber.complete(transcript_id, transcript_path, video_id,
+                                                  title, include_timestamps)
+            except APIError as e:
+                logger.warning(f"AssemblyAI não acessou a URL direta ({e}); usando download + upload")
+
+    async with gate:
+        if not await aiofiles.os.path.exists(audio_path):
+            await downloader._download_audio(f"https://www.youtube.com/watch?v={video_id}", audio_path)
+        transcript_id = await transcriber.submit_audio(audio_path)
+    return await transcriber.complete(transcript_id, transcript_path, video_id, title,
+                                      include_timestamps)
+
+async def process_video(video_id: str, config: Config, transcriber: 'Transcriber',
+                        sem: asyncio.Semaphore, direct_url: bool = False,
+                        include_timestamps: bool = True,
+                        title_cache: Optional[TitleCache] = None):
+    """Baixa e transcreve um vídeo do lote; o semáforo limita as etapas de rede."""
+    try:
+        downloader = YouTubeDownloader(config.ffmpeg_path, title_cache)
+        # O áudio é baixado em transcribe_video, junto do upload, sob o mesmo semáforo
+        async with sem:
+            audio_path, transcript_path, title = await downloader.download(
+                video_id, fetch_audio=False
+            )
+
+        if await aiofiles.os.path.exists(transcript_path):
+            logger.info(f"Transcrição existente mantida: {transcript_path}")
+            return
+
+        await transcribe_video(downloader, transcriber, video_id, audio_path,
+                               transcript_path, title, direct_url, include_timestamps, sem)
+        logger.info(f"Vídeo concluído: {video_id}")
+
+    except TranscriptionError as e:
+        logger.error(f"Erro na transcrição de {video_id}: {e}")
+    except Exception as e:
+        logger.error(f"Erro inesperado em {video_id}: {e}")
+
+async def process_batch(video_ids: list, config: Config, direct_url: bool = False,
+                        include_timestamps: bool = True):
+    """Processa vários vídeos em paralelo compartilhando uma única sessão HTTP."""
+    sem = asyncio.Semaphore(config.max_concurrency)
+    title_cache = TitleCache()
+    async with Transcriber(config) as transcriber:
+        async with asyncio.TaskGroup() as tg:
+            for video_id in video_ids:
+                tg.create_task(process_video(video_id, config, transcriber, sem,
+                                             direct_url, include_timestamps, title_cache))
 
 async def main():
     """Função principal assíncrona."""
@@ -362,8 +673,15 @@ async def main():
     parser = argparse.ArgumentParser(description='Transcribe YouTube videos')
     parser.add_argument('--mode', choices=['interactive', 'download-only'], default='interactive',
                         help='Modo de operação: interativo ou apenas download')
-    parser.add_argument('--video-id', help='ID do vídeo do YouTube')
+    parser.add_argument('--video-id', action='append',
+                        help='ID ou URL do vídeo do YouTube (pode ser repetido)')
+    parser.add_argument('--video-ids', help='Arquivo com um ID ou URL de vídeo por linha')
     parser.add_argument('--output', help='Caminho de saída para o arquivo de áudio')
+    parser.add_argument('--direct-url', action='store_true',
+                        help='Envia a URL direta do áudio à AssemblyAI, sem download e upload '
+                             '(volta ao download se a API não conseguir acessá-la)')
+    parser.add_argument('--no-timestamps', action='store_true',
+                        help='Omite a seção de timestamps por palavra do arquivo detalhado')
     
     args = parser.parse_args()
     
@@ -372,31 +690,60 @@ async def main():
         
         # Modo download-only (para ser chamado pelo código TypeScript)
         if args.mode == 'download-only':
-            if not args.video_id or not args.output:
-                logger.error("No modo download-only, você deve fornecer --video-id e --output")
+            if not args.video_id or len(args.video_id) != 1 or not args.output:
+                logger.error("No modo download-only, você deve fornecer um --video-id e --output")
                 sys.exit(1)
                 
             try:
-                video_id = args.video_id
+                video_id = extract_video_id(args.video_id[0])
                 output_path = args.output
                 
                 # Verificar se o diretório de áudio existe
                 audio_dir = os.path.dirname(output_path)
-                if not os.path.exists(audio_dir):
-                    os.makedirs(audio_dir, exist_ok=True)
+                if audio_dir:
+                    await aiofiles.os.makedirs(audio_dir, exist_ok=True)
                 
                 # Download do vídeo usando o método direto
                 print(f"Iniciando download do vídeo: {video_id}")
                 downloader = YouTubeDownloader(config.ffmpeg_path)
-                await downloader._download_audio(f"https://www.youtube.com/watch?v={video_id}", output_path)
+                audio_path = await downloader._download_audio(
+                    f"https://www.youtube.com/watch?v={video_id}", output_path
+                )
                 
-                print(f"Download concluído: {output_path}")
+                print(f"Download concluído: {audio_path}")
                 return
                 
             except Exception as e:
                 logger.error(f"Erro no download: {e}")
                 sys.exit(1)
         
+        # Modo em lote: IDs fornecidos por argumento ou arquivo
+        video_inputs = list(args.video_id or [])
+        if args.video_ids:
+            try:
+                with open(args.video_ids, 'r', encoding='utf-8') as f:
+                    video_inputs.extend(line.strip() for line in f if line.strip())
+            except OSError as e:
+                logger.error(f"Erro ao ler a lista de vídeos: {e}")
+                sys.exit(1)
+
+        if video_inputs:
+            video_ids = []
+            for video_input in video_inputs:
+                try:
+                    video_ids.append(extract_video_id(video_input))
+                except ValueError as e:
+                    logger.error(f"Entrada ignorada: {e}")
+            video_ids = list(dict.fromkeys(video_ids))
+            if not video_ids:
+                logger.error("Nenhum vídeo válido para processar")
+                sys.exit(1)
+
+            print(f"\nProcessando {len(video_ids)} vídeo(s)...")
+            await process_batch(video_ids, config, args.direct_url, not args.no_timestamps)
+            print("\nProcesso concluído!")
+            return
+
         # Modo interativo (original)
         print("\n=== TRANSCRIÇÃO DE VÍDEO DO YOUTUBE ===")
         print("\nDigite a URL do YouTube ou o ID do vídeo")
@@ -409,16 +756,13 @@ async def main():
 
         try:
             # Extrai ID do vídeo
-            if 'youtube.com' in video_input:
-                video_id = video_input.split('watch?v=')[1].split('&')[0]
-            elif 'youtu.be' in video_input:
-                video_id = video_input.split('youtu.be/')[1].split('?')[0]
-            else:
-                video_id = video_input
+            video_id = extract_video_id(video_input)
 
             # Download do vídeo
             downloader = YouTubeDownloader(config.ffmpeg_path)
-            audio_path, transcript_path = await downloader.download(video_id)
+            audio_path, transcript_path, title = await downloader.download(
+                video_id, fetch_audio=not args.direct_url
+            )
 
             # Verifica transcrição existente
             if os.path.exists(transcript_path):
@@ -431,7 +775,9 @@ async def main():
 
             # Transcrição
             async with Transcriber(config) as transcriber:
-                await transcriber.transcribe(audio_path, transcript_path, video_id)
+                await transcribe_video(downloader, transcriber, video_id, audio_path,
+                                       transcript_path, title, args.direct_url,
+                                       not args.no_timestamps)
 
             print("\nProcesso concluído com sucesso!")
 